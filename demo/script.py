@@ -5,47 +5,111 @@ Comprehensive Phishing Email Generator
 Combines JIRA API functionality, ticket storage, and GPT-4 phishing email generation
 """
 
+import io
 import os
 import sys
-import glob
+import csv
+import collections
 import json
-import tkinter as tk
-from tkinter import scrolledtext, messagebox
+import time
+import asyncio
+import argparse
+import functools
+import queue
 import re
-from typing import List, Dict, Any
+import string
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Callable, Iterator, Optional, Tuple
 from dotenv import load_dotenv
+import tiktoken
 
 # Add parent directory to path to import jiralib and linkly
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from jiralib import get_jira_connection, get_active_jira_issues_by_email, extract_issue_details
-from linkly import create_linkly_oneshot_link
+from jiralib import (get_jira_connection, get_active_jira_issues_by_email, get_active_jira_issues_by_emails,
+                     extract_issue_details, clear_jira_cache)
+from linkly import create_linkly_oneshot_link, create_linkly_links
+from llm_cache import LLMCache, cache_key
+from semantic_cache import SemanticCache
 
-# OpenAI imports
-from openai import OpenAI
+# Read .env once at import rather than on every generator instantiation
+load_dotenv()
+
+# Subject line of a generated email, anywhere in the body
+_SUBJECT_RE = re.compile(r'^Subject: (.+)$', re.MULTILINE)
+
+# Placeholder the model writes wherever a tracked link should go
+_LINK_PLACEHOLDER_RE = re.compile("LINK_HERE")
+
+# Per-target user message; the static prompts context is sent once as the system message
+_BASE_PROMPT_LEAD = "Based on the above organizational context and recent JIRA tickets, "
+_USER_PROMPT_TEMPLATE = string.Template("$jira_context\n\n" + _BASE_PROMPT_LEAD + "$base_prompt")
+
+# Rough characters-per-token estimate (not a bound: some tokens are longer), sizing each
+# read so a file larger than the remaining token budget isn't read in full
+_CHARS_PER_TOKEN_HINT = 8
+
+
+@functools.lru_cache(maxsize=None)
+def _get_encoding():
+    """Return the tokenizer used by GPT-4 Turbo, loaded once, or None if it can't be loaded."""
+    try:
+        return tiktoken.get_encoding("cl100k_base")
+    except Exception as e:
+        # The BPE file is downloaded on first use, which fails offline
+        print(f"⚠ Tokenizer unavailable, budgeting context by characters instead: {str(e)}")
+        return None
+
+
+def _results_filename(target_email: str, suffix: str = "") -> str:
+    """Default results filename for a target, with an optional suffix to tell duplicate targets apart."""
+    return f"phishing_email_{target_email.replace('@', '_').replace('.', '_')}{suffix}.txt"
 
 
 class PhishingEmailGenerator:
     """Main class that combines JIRA API, ticket storage, and GPT-4 generation"""
     
-    def __init__(self):
-        """Initialize the generator with API clients"""
-        load_dotenv()
+    # One OpenAI client shared by all instances so they reuse its connection pool
+    _shared_openai_client = None
+    
+    def __init__(self, prompts_dir: str = "./prompts", use_cache: bool = True,
+                 use_semantic_cache: bool = False):
+        """
+        Initialize the generator with API clients and the static prompts context
+        
+        Args:
+            prompts_dir: Path to prompts directory, loaded once up front
+            use_cache: Whether to reuse cached LLM responses for identical requests
+            use_semantic_cache: Whether to also reuse responses for near-duplicate prompts
+        """
         self.openai_client = self.setup_openai_client()
+        self.llm_cache = LLMCache(enabled=use_cache)
+        self.semantic_cache = SemanticCache() if use_cache and use_semantic_cache else None
         self.jira_tickets = []
-        self.context = ""
+        # Memoized create_jira_tickets_context output, keyed on the ticket list it was built from
+        self._jira_cache_key = None
+        self._jira_cache_value = ""
+        # Worker threads for API calls that must not block the Tk event loop
+        self._executor = ThreadPoolExecutor(max_workers=4)
+        # Static context is loaded once and reused as the system message for every generation
+        self.context = self.load_prompts_context(prompts_dir)
         # Load Linkly credentials from environment
         self.linkly_email = os.getenv("LINKLY_EMAIL")
         self.linkly_api_key = os.getenv("LINKLY_API_KEY")
         self.linkly_workspace_id = os.getenv("LINKLY_WORKSPACE_ID")
         
     def setup_openai_client(self):
-        """Setup OpenAI client with API key from environment variables."""
-        api_key = os.getenv("OPENAI_API_KEY")
-        
-        if not api_key:
-            raise ValueError("OPENAI_API_KEY not found in environment variables")
+        """Setup OpenAI client with API key from environment variables, created once per process."""
+        if PhishingEmailGenerator._shared_openai_client is None:
+            from openai import OpenAI
+            
+            api_key = os.getenv("OPENAI_API_KEY")
+            
+            if not api_key:
+                raise ValueError("OPENAI_API_KEY not found in environment variables")
+            
+            PhishingEmailGenerator._shared_openai_client = OpenAI(api_key=api_key)
         
-        return OpenAI(api_key=api_key)
+        return PhishingEmailGenerator._shared_openai_client
     
     def fetch_jira_tickets(self, email: str, max_results: int = 10) -> List[Dict[str, Any]]:
         """
@@ -63,6 +127,7 @@ class PhishingEmailGenerator:
         try:
             tickets = get_active_jira_issues_by_email(email, max_results)
             self.jira_tickets = tickets
+            self._jira_cache_key = None
             
             if tickets:
                 print(f"✓ Fetched {len(tickets)} active JIRA tickets")
@@ -87,64 +152,94 @@ class PhishingEmailGenerator:
         Returns:
             Combined context string
         """
-        context_parts = []
-        
         if not os.path.exists(prompts_dir):
             print(f"Prompts directory '{prompts_dir}' not found.")
             return ""
         
-        pattern = os.path.join(prompts_dir, "*.txt")
-        txt_files = glob.glob(pattern)
+        # scandir entries carry their type, so no extra stat per file
+        try:
+            with os.scandir(prompts_dir) as it:
+                txt_entries = [e for e in it if e.is_file() and e.name.endswith('.txt')]
+        except OSError:
+            # Not a listable directory (e.g. a file path); treat it like a folder with no prompts
+            txt_entries = []
         
-        if not txt_files:
+        if not txt_entries:
             print(f"No .txt files found in '{prompts_dir}'")
             return ""
         
-        # Sort files to prioritize those with "context" in the name
-        context_files = [f for f in txt_files if "context" in os.path.basename(f).lower()]
-        other_files = [f for f in txt_files if "context" not in os.path.basename(f).lower()]
-        
-        # Prioritize context files first, then other files
-        sorted_files = context_files + other_files
+        # Prioritize files with "context" in the name first, then other files
+        sorted_entries = sorted(txt_entries, key=lambda e: 0 if "context" in e.name.lower() else 1)
+        context_count = sum(1 for e in txt_entries if "context" in e.name.lower())
         
-        print(f"Loading context from {len(sorted_files)} files:")
-        if context_files:
-            print(f"  Prioritizing {len(context_files)} context file(s) first")
+        print(f"Loading context from {len(sorted_entries)} files:")
+        if context_count:
+            print(f"  Prioritizing {context_count} context file(s) first")
         
-        context_parts.append("=== CONTEXT INFORMATION ===")
+        buf = io.StringIO()
+        buf.write("=== CONTEXT INFORMATION ===\n")
         
-        total_chars = 0
-        max_context_chars = 90000  # Limit for GPT-4 Turbo
+        encoding = _get_encoding()
+        if encoding is not None:
+            unit = "tokens"
+            max_context_tokens = 100000  # Budget within GPT-4 Turbo's 128k token window
+            chars_per_token = _CHARS_PER_TOKEN_HINT
+            # Prompt files are plain text; special-token markers in them are just text
+            encode = functools.partial(encoding.encode, disallowed_special=())
+            decode = encoding.decode
+        else:
+            # Without the tokenizer fall back to the original character budget,
+            # counting each character as one "token"
+            unit = "characters"
+            max_context_tokens = 90000
+            chars_per_token = 1
+            encode = decode = str
+        total_tokens = 0
         
-        for file_path in sorted_files:
+        for entry in sorted_entries:
+            filename = entry.name
+            remaining_tokens = max_context_tokens - total_tokens
+            if remaining_tokens <= 100:
+                print(f"  ⚠ {filename} skipped (would exceed context limit)")
+                continue
+            
             try:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    filename = os.path.basename(file_path)
-                    content = f.read().strip()
+                with open(entry.path, 'r', encoding='utf-8') as f:
+                    # Read in budget-sized chunks; the estimate can undershoot, so keep reading
+                    # while everything read so far still fits in the remaining token budget
+                    chunk_chars = remaining_tokens * chars_per_token
+                    content = f.read(chunk_chars)
+                    more = f.read(chunk_chars)
+                    while more and len(encode(content)) <= remaining_tokens:
+                        content += more
+                        more = f.read(chunk_chars)
+                    truncated = bool(more)
+                    content = content.strip()
                     if content:
                         # Check if adding this content would exceed our limit
-                        if total_chars + len(content) > max_context_chars:
-                            remaining_chars = max_context_chars - total_chars
-                            if remaining_chars > 100:
-                                content = content[:remaining_chars] + "... [truncated]"
-                            else:
-                                print(f"  ⚠ {filename} skipped (would exceed context limit)")
-                                continue
+                        tokens = encode(content)
+                        if len(tokens) > remaining_tokens:
+                            tokens = tokens[:remaining_tokens]
+                            content = decode(tokens)
+                            truncated = True
+                        if truncated:
+                            content += "... [truncated]"
                         
                         priority_marker = " [PRIORITY]" if "context" in filename.lower() else ""
-                        context_parts.append(f"\n--- {filename.upper()}{priority_marker} ---")
-                        context_parts.append(content)
-                        total_chars += len(content)
-                        print(f"  ✓ {filename} ({len(content)} characters){priority_marker}")
+                        buf.write(f"\n--- {filename.upper()}{priority_marker} ---\n")
+                        buf.write(content)
+                        buf.write("\n")
+                        total_tokens += len(tokens)
+                        print(f"  ✓ {filename} ({len(tokens)} {unit}){priority_marker}")
                     else:
                         print(f"  ⚠ {filename} (empty file)")
             except Exception as e:
-                print(f"  ✗ Error reading {file_path}: {str(e)}")
+                print(f"  ✗ Error reading {entry.path}: {str(e)}")
         
-        context_parts.append("\n=== END OF CONTEXT ===\n")
+        buf.write("\n=== END OF CONTEXT ===\n")
         
-        print(f"Total context loaded: {total_chars} characters")
-        self.context = "\n".join(context_parts)
+        print(f"Total context loaded: {total_tokens} {unit} ({buf.tell()} characters)")
+        self.context = buf.getvalue()
         return self.context
     
     def create_jira_tickets_context(self) -> str:
@@ -158,46 +253,53 @@ class PhishingEmailGenerator:
             print("⚠ No JIRA tickets available for context")
             return ""
         
-        context_parts = []
-        context_parts.append("=== RECENT JIRA TICKETS FOR TARGET USER ===")
-        context_parts.append(f"Total Active Tickets: {len(self.jira_tickets)}")
-        context_parts.append("")
+        # Reuse the previous result while the ticket list is unchanged
+        tickets_key = (id(self.jira_tickets), len(self.jira_tickets))
+        if self._jira_cache_key == tickets_key:
+            return self._jira_cache_value
+        
+        buf = io.StringIO()
+        buf.write("=== RECENT JIRA TICKETS FOR TARGET USER ===\n")
+        buf.write(f"Total Active Tickets: {len(self.jira_tickets)}\n")
+        buf.write("\n")
         
         for i, ticket in enumerate(self.jira_tickets[:5], 1):  # Limit to 5 most recent
-            context_parts.append(f"TICKET #{i}: {ticket['key']}")
-            context_parts.append(f"Summary: {ticket['summary']}")
-            context_parts.append(f"Status: {ticket['status']}")
-            context_parts.append(f"Priority: {ticket['priority']}")
-            context_parts.append(f"Issue Type: {ticket['issue_type']}")
-            context_parts.append(f"Assignee: {ticket['assignee']}")
-            context_parts.append(f"Reporter: {ticket['reporter']}")
-            context_parts.append(f"Project: {ticket['project_name']} ({ticket['project_key']})")
-            context_parts.append(f"Created: {ticket['created']}")
-            context_parts.append(f"Updated: {ticket['updated']}")
+            buf.write(f"TICKET #{i}: {ticket['key']}\n")
+            buf.write(f"Summary: {ticket['summary']}\n")
+            buf.write(f"Status: {ticket['status']}\n")
+            buf.write(f"Priority: {ticket['priority']}\n")
+            buf.write(f"Issue Type: {ticket['issue_type']}\n")
+            buf.write(f"Assignee: {ticket['assignee']}\n")
+            buf.write(f"Reporter: {ticket['reporter']}\n")
+            buf.write(f"Project: {ticket['project_name']} ({ticket['project_key']})\n")
+            buf.write(f"Created: {ticket['created']}\n")
+            buf.write(f"Updated: {ticket['updated']}\n")
             
             if ticket['description']:
-                context_parts.append(f"Description: {ticket['description']}")
+                buf.write(f"Description: {ticket['description']}\n")
             
             if ticket['labels']:
-                context_parts.append(f"Labels: {', '.join(ticket['labels'])}")
+                buf.write(f"Labels: {', '.join(ticket['labels'])}\n")
             
             if ticket['components']:
-                context_parts.append(f"Components: {', '.join(ticket['components'])}")
+                buf.write(f"Components: {', '.join(ticket['components'])}\n")
             
-            context_parts.append("---")
+            buf.write("---\n")
         
         if len(self.jira_tickets) > 5:
-            context_parts.append(f"[Additional {len(self.jira_tickets) - 5} tickets not shown for brevity]")
+            buf.write(f"[Additional {len(self.jira_tickets) - 5} tickets not shown for brevity]\n")
         
-        context_parts.append("=== END OF JIRA TICKETS ===\n")
+        buf.write("=== END OF JIRA TICKETS ===\n")
         
         print(f"✓ Created JIRA context with {len(self.jira_tickets)} tickets")
-        return "\n".join(context_parts)
+        self._jira_cache_key = tickets_key
+        self._jira_cache_value = buf.getvalue()
+        return self._jira_cache_value
     
-    def generate_phishing_email(self, target_email: str, impersonate: str = "", 
-                              model: str = "gpt-4-turbo") -> str:
+    def build_chat_payload(self, target_email: str, impersonate: str = "",
+                           model: str = "gpt-4-turbo") -> Dict[str, Any]:
         """
-        Generate phishing email using GPT-4 with context and JIRA tickets
+        Build the chat completion request for a target from the current JIRA tickets
         
         Args:
             target_email: Email of the target user
@@ -205,11 +307,8 @@ class PhishingEmailGenerator:
             model: OpenAI model to use
             
         Returns:
-            Generated phishing email content
+            Keyword arguments for chat.completions.create
         """
-        # Prepare the full context
-        prompts_context = self.context if self.context else self.load_prompts_context()
-        
         # Always create JIRA context from current tickets
         jira_context = self.create_jira_tickets_context()
         
@@ -222,62 +321,384 @@ class PhishingEmailGenerator:
         if target_email:
             base_prompt += f" The target is {target_email}."
         
-        # Combine all context - ensure JIRA tickets are always included
-        full_prompt = f"{prompts_context}\n{jira_context}\n\nBased on the above organizational context and recent JIRA tickets, {base_prompt}"
+        # Static prompts context goes first in its own system message so OpenAI's automatic
+        # prompt caching can match it as a prefix; only the per-target part varies
+        user_prompt = _USER_PROMPT_TEMPLATE.substitute(jira_context=jira_context, base_prompt=base_prompt)
         print(f"✓ Including {len(self.jira_tickets)} JIRA tickets in context")
         
-     
+        return {
+            "model": model,
+            "messages": [
+                {"role": "system", "content": self.context},
+                {"role": "user", "content": user_prompt}
+            ],
+            "max_tokens": 1000,
+            "temperature": 0.7
+        }
+    
+    def get_cached_response(self, payload: Dict[str, Any]):
+        """
+        Look up a previous response for a request in the exact and semantic caches
+        
+        Args:
+            payload: Request built by build_chat_payload
+            
+        Returns:
+            Tuple of (cached response or None, cache key, prompt embedding)
+        """
+        # Identical requests (same model, prompt and sampling settings) reuse the stored response
+        key = cache_key(payload)
+        cached = self.llm_cache.get(key)
+        if cached is not None:
+            print("✓ Using cached response (no API call)")
+            return cached, key, None
+        
+        # Near-duplicate prompts (e.g. only the ticket text differs) can reuse a semantic match
+        prompt_vector = None
+        if self.semantic_cache:
+            cached, prompt_vector = self.semantic_cache.search(
+                self._semantic_prompt(payload), namespace=self._semantic_namespace(payload)
+            )
+            if cached is not None:
+                print("✓ Using semantically similar cached response (no API call)")
+                return cached, key, prompt_vector
+        
+        return None, key, prompt_vector
+    
+    def store_cached_response(self, payload: Dict[str, Any], key: str, prompt_vector, content: str):
+        """Store a fresh response in the exact and semantic caches."""
+        # An empty completion (e.g. content-filtered) would otherwise be replayed as a hit until it expires
+        if not content:
+            return
+        self.llm_cache.set(key, content, ttl=3600)
+        if self.semantic_cache and prompt_vector is not None:
+            self.semantic_cache.add(prompt_vector, content, namespace=self._semantic_namespace(payload))
+    
+    @staticmethod
+    def _semantic_prompt(payload: Dict[str, Any]) -> str:
+        """Text embedded for the semantic cache: the user message with its target sentence moved first."""
+        # The embedding model truncates long inputs, so the target/impersonate sentence goes ahead of
+        # the JIRA context; the system context is already covered exactly by _semantic_namespace
+        jira_context, _, base_prompt = payload["messages"][-1]["content"].rpartition(_BASE_PROMPT_LEAD)
+        return f"{base_prompt}\n\n{jira_context.rstrip()}"
+    
+    @staticmethod
+    def _semantic_namespace(payload: Dict[str, Any]) -> str:
+        """Semantic cache partition for a request: only the same model and prompts context can match."""
+        return cache_key({"model": payload["model"], "system": payload["messages"][0]["content"]})
+    
+    def stream_phishing_email(self, target_email: str, impersonate: str = "",
+                              model: str = "gpt-4-turbo") -> Iterator[str]:
+        """
+        Generate phishing email, yielding content chunks as the model produces them
+        
+        Args:
+            target_email: Email of the target user
+            impersonate: Person to impersonate in the email
+            model: OpenAI model to use
+            
+        Returns:
+            Iterator over generated content chunks (a cached response arrives as one chunk)
+        """
+        payload = self.build_chat_payload(target_email, impersonate, model)
+        
         print(f"Generating phishing email...")
         print(f"Target: {target_email}")
         if impersonate:
             print(f"Impersonating: {impersonate}")
         
-        try:
-            response = self.openai_client.chat.completions.create(
-                model=model,
-                messages=[
-                    {"role": "user", "content": full_prompt}
-                ],
-                max_tokens=1000,
-                temperature=0.7
-            )
+        cached, key, prompt_vector = self.get_cached_response(payload)
+        if cached is not None:
+            yield cached
+            return
+        
+        response = self.openai_client.chat.completions.create(**payload, stream=True)
+        
+        parts = []
+        for chunk in response:
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta.content
+            if delta:
+                parts.append(delta)
+                yield delta
+        
+        self.store_cached_response(payload, key, prompt_vector, "".join(parts))
+    
+    def generate_phishing_email(self, target_email: str, impersonate: str = "", 
+                              model: str = "gpt-4-turbo") -> str:
+        """
+        Generate phishing email using GPT-4 with context and JIRA tickets
+        
+        Args:
+            target_email: Email of the target user
+            impersonate: Person to impersonate in the email
+            model: OpenAI model to use
             
-            return response.choices[0].message.content
+        Returns:
+            Generated phishing email content
+        """
+        try:
+            return "".join(self.stream_phishing_email(target_email, impersonate, model))
             
         except Exception as e:
             print(f"Error generating phishing email: {str(e)}")
             return None
     
-    def replace_links_with_linkly(self, phishing_email: str) -> str:
+    async def _complete_all(self, payloads: List[Dict[str, Any]], concurrency: int = 20) -> List[str]:
         """
-        Replace all instances of LINK_HERE with actual Linkly shortened links
+        Run chat completions concurrently, at most `concurrency` in flight
         
         Args:
-            phishing_email: Email content with LINK_HERE placeholders
+            payloads: Requests built by build_chat_payload
+            concurrency: Maximum number of simultaneous API requests
             
         Returns:
-            Email content with real shortened links
+            Response contents in the same order as payloads (None for failures)
         """
-        if "LINK_HERE" not in phishing_email:
-            print("⚠ No LINK_HERE placeholders found in email")
-            return phishing_email
+        from openai import AsyncOpenAI
+        
+        semaphore = asyncio.Semaphore(concurrency)
+        
+        async with AsyncOpenAI(api_key=self.openai_client.api_key) as client:
+            async def complete(payload: Dict[str, Any]) -> str:
+                async with semaphore:
+                    try:
+                        response = await client.chat.completions.create(**payload)
+                        return response.choices[0].message.content
+                    except Exception as e:
+                        print(f"Error generating phishing email: {str(e)}")
+                        return None
+            
+            return await asyncio.gather(*[complete(payload) for payload in payloads])
+    
+    def prepare_campaign(self, targets: List[Tuple[str, str]], model: str = "gpt-4-turbo",
+                         max_results: int = 10):
+        """
+        Fetch JIRA tickets and build requests for every target, resolving cache hits
+        
+        Args:
+            targets: List of (target_email, impersonate) tuples
+            model: OpenAI model to use
+            max_results: Maximum number of JIRA tickets to fetch per target
+            
+        Returns:
+            Tuple of (results, pending): result dictionaries (target_email, impersonate,
+            jira_tickets, phishing_email) in target order, and (result, payload, key,
+            prompt_vector) tuples for the results that still need an API call
+        """
+        results = []
+        pending = []
+        
+        # JIRA searches are latency-bound, so fetch every target's tickets concurrently up front
+        print(f"Fetching JIRA tickets for {len(targets)} target(s)...")
+        tickets_by_email = get_active_jira_issues_by_emails([email for email, _ in targets], max_results)
+        
+        for target_email, impersonate in targets:
+            self.jira_tickets = tickets_by_email.get(target_email, [])
+            self._jira_cache_key = None
+            print(f"  {target_email}: {len(self.jira_tickets)} active ticket(s)")
+            payload = self.build_chat_payload(target_email, impersonate, model)
+            cached, key, prompt_vector = self.get_cached_response(payload)
+            
+            result = {
+                'target_email': target_email,
+                'impersonate': impersonate,
+                'jira_tickets': self.jira_tickets,
+                'phishing_email': cached
+            }
+            results.append(result)
+            if cached is None:
+                pending.append((result, payload, key, prompt_vector))
+        
+        return results, pending
+    
+    def generate_phishing_emails_batch(self, targets: List[Tuple[str, str]], model: str = "gpt-4-turbo",
+                                       max_results: int = 10) -> List[Dict[str, Any]]:
+        """
+        Generate phishing emails for many targets with concurrent API requests
+        
+        Args:
+            targets: List of (target_email, impersonate) tuples
+            model: OpenAI model to use
+            max_results: Maximum number of JIRA tickets to fetch per target
+            
+        Returns:
+            List of result dictionaries (target_email, impersonate, jira_tickets, phishing_email)
+            in the same order as targets
+        """
+        results, pending = self.prepare_campaign(targets, model, max_results)
+        
+        print(f"Generating {len(pending)} phishing email(s) concurrently "
+              f"({len(results) - len(pending)} served from cache)...")
+        contents = asyncio.run(self._complete_all([payload for _, payload, _, _ in pending]))
+        
+        for (result, payload, key, prompt_vector), content in zip(pending, contents):
+            result['phishing_email'] = content
+            self.store_cached_response(payload, key, prompt_vector, content)
+        
+        return results
+    
+    def generate_batch_jsonl(self, requests: List[Tuple[str, Dict[str, Any]]],
+                             jsonl_path: str = "batch_requests.jsonl") -> str:
+        """
+        Write chat completion requests in the OpenAI Batch API input format
         
+        Args:
+            requests: List of (custom_id, payload) tuples
+            jsonl_path: Path of the JSONL file to write
+            
+        Returns:
+            Path of the written file
+        """
+        with open(jsonl_path, 'w', encoding='utf-8') as f:
+            for custom_id, payload in requests:
+                f.write(json.dumps({
+                    "custom_id": custom_id,
+                    "method": "POST",
+                    "url": "/v1/chat/completions",
+                    "body": payload
+                }) + "\n")
+        
+        print(f"✓ Wrote {len(requests)} batch request(s) to {jsonl_path}")
+        return jsonl_path
+    
+    def submit_batch(self, jsonl_path: str) -> str:
+        """
+        Upload a batch input file and start a batch job
+        
+        Args:
+            jsonl_path: Path of a file written by generate_batch_jsonl
+            
+        Returns:
+            ID of the created batch
+        """
+        with open(jsonl_path, 'rb') as f:
+            batch_file = self.openai_client.files.create(file=f, purpose="batch")
+        
+        batch = self.openai_client.batches.create(
+            input_file_id=batch_file.id,
+            endpoint="/v1/chat/completions",
+            completion_window="24h"
+        )
+        
+        print(f"✓ Submitted batch {batch.id}")
+        return batch.id
+    
+    def await_batch(self, batch_id: str, poll_interval: float = 10, max_interval: float = 300) -> Dict[str, str]:
+        """
+        Wait for a batch job to finish and download its results
+        
+        Args:
+            batch_id: ID returned by submit_batch
+            poll_interval: Initial seconds between status checks, doubled after each check
+            max_interval: Upper bound on seconds between status checks
+            
+        Returns:
+            Dictionary mapping custom_id to generated content (None for failed requests)
+        """
+        while True:
+            batch = self.openai_client.batches.retrieve(batch_id)
+            if batch.status in ("completed", "failed", "expired", "cancelled"):
+                break
+            
+            print(f"  Batch {batch_id} is {batch.status}, checking again in {poll_interval:.0f}s")
+            time.sleep(poll_interval)
+            poll_interval = min(poll_interval * 2, max_interval)
+        
+        print(f"✓ Batch {batch_id} finished with status: {batch.status}")
+        if not batch.output_file_id:
+            return {}
+        
+        contents = {}
+        output = self.openai_client.files.content(batch.output_file_id)
+        for line in output.text.splitlines():
+            if not line.strip():
+                continue
+            
+            item = json.loads(line)
+            response = item.get("response") or {}
+            if response.get("status_code") == 200:
+                contents[item["custom_id"]] = response["body"]["choices"][0]["message"]["content"]
+            else:
+                print(f"Error generating phishing email for {item['custom_id']}: {item.get('error')}")
+                contents[item["custom_id"]] = None
+        
+        return contents
+    
+    def generate_phishing_emails_batch_api(self, targets: List[Tuple[str, str]], model: str = "gpt-4-turbo",
+                                           max_results: int = 10) -> List[Dict[str, Any]]:
+        """
+        Generate phishing emails for many targets through the OpenAI Batch API
+        
+        Args:
+            targets: List of (target_email, impersonate) tuples
+            model: OpenAI model to use
+            max_results: Maximum number of JIRA tickets to fetch per target
+            
+        Returns:
+            List of result dictionaries (target_email, impersonate, jira_tickets, phishing_email)
+            in the same order as targets
+        """
+        results, pending = self.prepare_campaign(targets, model, max_results)
+        if not pending:
+            return results
+        
+        # custom_id must be unique per batch, and a targets file may list the same email twice
+        custom_ids = [f"{index}:{result['target_email']}" for index, (result, _, _, _) in enumerate(pending)]
+        jsonl_path = self.generate_batch_jsonl(
+            [(custom_id, payload) for custom_id, (_, payload, _, _) in zip(custom_ids, pending)]
+        )
+        try:
+            batch_id = self.submit_batch(jsonl_path)
+        finally:
+            os.remove(jsonl_path)
+        contents = self.await_batch(batch_id)
+        
+        for custom_id, (result, payload, key, prompt_vector) in zip(custom_ids, pending):
+            content = contents.get(custom_id)
+            result['phishing_email'] = content
+            self.store_cached_response(payload, key, prompt_vector, content)
+        
+        return results
+    
+    def get_linkly_workspace_id(self) -> Optional[int]:
+        """
+        Check that Linkly credentials are configured
+        
+        Returns:
+            Linkly workspace ID as an integer, or None when credentials are missing or invalid
+        """
         # Check if Linkly credentials are available
         if not all([self.linkly_email, self.linkly_api_key, self.linkly_workspace_id]):
             print("⚠ Linkly credentials not found in environment variables")
             print("  Skipping link replacement. Please set LINKLY_EMAIL, LINKLY_API_KEY, and LINKLY_WORKSPACE_ID")
-            return phishing_email
+            return None
         
         # Convert workspace_id to int
         try:
-            workspace_id = int(self.linkly_workspace_id)
+            return int(self.linkly_workspace_id)
         except ValueError:
             print("⚠ LINKLY_WORKSPACE_ID must be an integer")
+            return None
+    
+    def replace_links_with_linkly(self, phishing_email: str) -> str:
+        """
+        Replace all instances of LINK_HERE with actual Linkly shortened links
+        
+        Args:
+            phishing_email: Email content with LINK_HERE placeholders
+            
+        Returns:
+            Email content with real shortened links
+        """
+        if "LINK_HERE" not in phishing_email:
+            print("⚠ No LINK_HERE placeholders found in email")
             return phishing_email
         
-        # Count placeholders
-        placeholder_count = phishing_email.count("LINK_HERE")
-        print(f"🔗 Found {placeholder_count} LINK_HERE placeholder(s)")
+        workspace_id = self.get_linkly_workspace_id()
+        if workspace_id is None:
+            return phishing_email
         
         # Create a Linkly shortened link
         print("🔗 Creating Linkly shortened link...")
@@ -296,8 +717,8 @@ class PhishingEmailGenerator:
                 if short_url:
                     print(f"✓ Created shortened link: {short_url}")
                     
-                    # Replace all instances of LINK_HERE with the shortened link
-                    updated_email = phishing_email.replace("LINK_HERE", short_url)
+                    # Replace all instances of LINK_HERE with the shortened link, counting them in the same pass
+                    updated_email, placeholder_count = _LINK_PLACEHOLDER_RE.subn(lambda _: short_url, phishing_email)
                     print(f"✓ Replaced {placeholder_count} placeholder(s) with shortened link")
                     
                     return updated_email
@@ -312,7 +733,51 @@ class PhishingEmailGenerator:
             print(f"⚠ Error creating Linkly link: {str(e)}")
             return phishing_email
     
-    def save_results(self, phishing_email: str, target_email: str, filename: str = None):
+    def replace_links_with_linkly_batch(self, phishing_emails: List[str]) -> List[str]:
+        """
+        Replace LINK_HERE placeholders in many emails, creating their Linkly links concurrently
+        
+        Args:
+            phishing_emails: Email contents with LINK_HERE placeholders (None entries are kept as is)
+            
+        Returns:
+            Email contents with real shortened links, in the same order
+        """
+        updated_emails = list(phishing_emails)
+        needs_link = [i for i, email in enumerate(phishing_emails) if email and "LINK_HERE" in email]
+        if not needs_link:
+            print("⚠ No LINK_HERE placeholders found in emails")
+            return updated_emails
+        
+        workspace_id = self.get_linkly_workspace_id()
+        if workspace_id is None:
+            return updated_emails
+        
+        # Each email gets its own one-shot link, so links are created per email rather than shared
+        print(f"🔗 Creating {len(needs_link)} Linkly shortened link(s) concurrently...")
+        try:
+            link_responses = create_linkly_links(
+                email=self.linkly_email,
+                api_key=self.linkly_api_key,
+                workspace_id=workspace_id,
+                urls=["https://www.method.me"] * len(needs_link)
+            )
+        except Exception as e:
+            print(f"⚠ Error creating Linkly links: {str(e)}")
+            return updated_emails
+        
+        for i, link_response in zip(needs_link, link_responses):
+            short_url = link_response.get('full_url') if link_response else None
+            if short_url:
+                updated_emails[i] = _LINK_PLACEHOLDER_RE.sub(lambda _: short_url, updated_emails[i])
+            else:
+                print(f"⚠ Failed to create Linkly link for email #{i + 1}")
+        
+        print(f"✓ Replaced placeholders in {sum(1 for r in link_responses if r and r.get('full_url'))} email(s)")
+        return updated_emails
+    
+    def save_results(self, phishing_email: str, target_email: str, filename: str = None,
+                     jira_tickets: List[Dict[str, Any]] = None):
         """
         Save the generated results to file
         
@@ -320,45 +785,66 @@ class PhishingEmailGenerator:
             phishing_email: Generated phishing email content
             target_email: Target email address
             filename: Optional custom filename
+            jira_tickets: Tickets used for this email (defaults to the current tickets)
         """
+        if jira_tickets is None:
+            jira_tickets = self.jira_tickets
+        
         if not filename:
-            filename = f"phishing_email_{target_email.replace('@', '_').replace('.', '_')}.txt"
+            filename = _results_filename(target_email)
+        
+        buf = io.StringIO()
+        buf.write("PHISHING EMAIL GENERATOR RESULTS\n")
+        buf.write("=" * 50 + "\n\n")
+        buf.write(f"Target Email: {target_email}\n")
+        buf.write(f"Generated on: {os.getcwd()}\n")
+        buf.write(f"JIRA Tickets Used: {len(jira_tickets)}\n")
+        buf.write("=" * 50 + "\n\n")
+        
+        buf.write("GENERATED PHISHING EMAIL:\n")
+        buf.write("-" * 30 + "\n")
+        buf.write(phishing_email)
+        buf.write("\n\n" + "=" * 50 + "\n\n")
         
+        # Write everything in one call to a temp file, then swap it in so a crash
+        # never leaves a half-written results file behind
+        tmp_filename = filename + ".tmp"
         try:
-            with open(filename, 'w', encoding='utf-8') as f:
-                f.write("PHISHING EMAIL GENERATOR RESULTS\n")
-                f.write("=" * 50 + "\n\n")
-                f.write(f"Target Email: {target_email}\n")
-                f.write(f"Generated on: {os.getcwd()}\n")
-                f.write(f"JIRA Tickets Used: {len(self.jira_tickets)}\n")
-                f.write("=" * 50 + "\n\n")
-                
-                f.write("GENERATED PHISHING EMAIL:\n")
-                f.write("-" * 30 + "\n")
-                f.write(phishing_email)
-                f.write("\n\n" + "=" * 50 + "\n\n")
-                
-                
+            with open(tmp_filename, 'w', encoding='utf-8') as f:
+                f.write(buf.getvalue())
+            os.replace(tmp_filename, filename)
+            
             print(f"✓ Results saved to: {filename}")
             
         except Exception as e:
             print(f"✗ Error saving results: {str(e)}")
+            if os.path.exists(tmp_filename):
+                os.remove(tmp_filename)
 
-    def show_email_gui(self, phishing_email: str, target_email: str):
+    def show_email_gui(self, phishing_email: str, target_email: str, email_stream: Iterator[str] = None,
+                       on_complete: Callable[[str], str] = None):
         """
         Display the generated phishing email in a Tkinter GUI
         
         Args:
             phishing_email: Generated phishing email content
             target_email: Target email address
+            email_stream: Optional chunk iterator (e.g. stream_phishing_email) consumed in a worker
+                thread while the window stays responsive; phishing_email is ignored when given
+            on_complete: Optional function run in the worker thread on the finished email,
+                returning the text to display (e.g. after link replacement)
         """
+        # GUI modules are only needed when the viewer opens, keep them off the headless path
+        import tkinter as tk
+        from tkinter import scrolledtext, messagebox
+        
         root = tk.Tk()
         root.title("🎯 Phishing Email Training Viewer")
         root.geometry("900x700")
         root.configure(bg='#f0f0f0')
         
         # Extract subject from email if present
-        subject_match = re.search(r'Subject: (.+)', phishing_email)
+        subject_match = _SUBJECT_RE.search(phishing_email)
         subject = subject_match.group(1) if subject_match else "Phishing Email Training"
         
         # Header frame with email metadata
@@ -375,8 +861,9 @@ class PhishingEmailGenerator:
         
         tk.Label(meta_frame, text=f"📧 To: {target_email}", 
                 font=('Arial', 11, 'bold'), bg='#e9ecef').pack(anchor='w', padx=10)
-        tk.Label(meta_frame, text=f"📋 Subject: {subject}", 
-                font=('Arial', 11, 'bold'), bg='#e9ecef').pack(anchor='w', padx=10)
+        subject_label = tk.Label(meta_frame, text=f"📋 Subject: {subject}", 
+                                font=('Arial', 11, 'bold'), bg='#e9ecef')
+        subject_label.pack(anchor='w', padx=10)
         tk.Label(meta_frame, text=f"📊 JIRA Tickets Used: {len(self.jira_tickets)}", 
                 font=('Arial', 10), bg='#e9ecef', fg='#666').pack(anchor='w', padx=10)
         
@@ -399,8 +886,45 @@ class PhishingEmailGenerator:
             borderwidth=2
         )
         text_area.pack(fill='both', expand=True, padx=5, pady=5)
-        text_area.insert('1.0', phishing_email)
-        text_area.config(state='disabled')  # Make read-only
+        
+        if email_stream is None:
+            text_area.insert('1.0', phishing_email)
+            text_area.config(state='disabled')  # Make read-only
+        else:
+            # Generation runs in a worker thread; the Tk loop polls for new chunks so it never blocks
+            deltas = queue.Queue()
+            
+            def generate() -> str:
+                parts = []
+                for delta in email_stream:
+                    parts.append(delta)
+                    deltas.put(delta)
+                email = "".join(parts)
+                return on_complete(email) if on_complete else email
+            
+            future = self._executor.submit(generate)
+            
+            def check_future():
+                while not deltas.empty():
+                    text_area.insert('end', deltas.get_nowait())
+                    text_area.see('end')
+                
+                if not future.done():
+                    root.after(100, check_future)
+                    return
+                
+                if future.exception():
+                    messagebox.showerror("Generation failed", f"Error generating phishing email: {future.exception()}")
+                else:
+                    final_email = future.result()
+                    text_area.delete('1.0', 'end')
+                    text_area.insert('1.0', final_email)
+                    subject_match = _SUBJECT_RE.search(final_email)
+                    if subject_match:
+                        subject_label.config(text=f"📋 Subject: {subject_match.group(1)}")
+                text_area.config(state='disabled')  # Make read-only
+            
+            root.after(100, check_future)
         
         # Warning footer
         warning_frame = tk.Frame(root, bg='#fff3cd', pady=10)
@@ -423,7 +947,7 @@ class PhishingEmailGenerator:
         # Copy to clipboard button
         def copy_to_clipboard():
             root.clipboard_clear()
-            root.clipboard_append(phishing_email)
+            root.clipboard_append(text_area.get('1.0', 'end-1c'))
             messagebox.showinfo("Copied", "Email content copied to clipboard!")
         
         tk.Button(button_frame, text="Copy Email", command=copy_to_clipboard,
@@ -440,41 +964,136 @@ class PhishingEmailGenerator:
         root.mainloop()
 
 
+def load_targets(csv_path: str) -> List[Tuple[str, str]]:
+    """
+    Load campaign targets from a CSV file with an `email` and optional `impersonate` column
+    
+    Args:
+        csv_path: Path to the targets CSV file
+        
+    Returns:
+        List of (target_email, impersonate) tuples
+    """
+    with open(csv_path, 'r', encoding='utf-8', newline='') as f:
+        # Short rows leave missing columns as None, so fall back to '' before stripping
+        return [(row['email'].strip(), (row.get('impersonate') or '').strip())
+                for row in csv.DictReader(f) if (row.get('email') or '').strip()]
+
+
+def run_campaign(generator: PhishingEmailGenerator, targets: List[Tuple[str, str]], use_batch_api: bool = False):
+    """
+    Generate, link and save phishing emails for every target of a campaign
+    
+    Args:
+        generator: Initialized generator
+        targets: List of (target_email, impersonate) tuples
+        use_batch_api: Submit through the OpenAI Batch API instead of concurrent requests
+    """
+    print(f"\nSTEP 2: Generating phishing emails for {len(targets)} target(s)...")
+    if use_batch_api:
+        results = generator.generate_phishing_emails_batch_api(targets)
+    else:
+        results = generator.generate_phishing_emails_batch(targets)
+    
+    print("\nSTEP 3: Replacing link placeholders and saving results...")
+    phishing_emails = generator.replace_links_with_linkly_batch([result['phishing_email'] for result in results])
+    # A target listed more than once gets one file per row instead of overwriting its earlier results
+    email_counts = collections.Counter(result['target_email'] for result in results)
+    for row_number, (result, phishing_email) in enumerate(zip(results, phishing_emails), start=1):
+        if not phishing_email:
+            print(f"✗ Failed to generate phishing email for {result['target_email']}")
+            continue
+        
+        suffix = f"_{row_number}" if email_counts[result['target_email']] > 1 else ""
+        generator.save_results(phishing_email, result['target_email'],
+                               filename=_results_filename(result['target_email'], suffix),
+                               jira_tickets=result['jira_tickets'])
+
+
 def main():
     """Main execution function"""
+    parser = argparse.ArgumentParser(description="Phishing Email Generator for Cybersecurity Training")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Always call the OpenAI API and clear cached JIRA responses")
+    parser.add_argument("--semantic-cache", action="store_true",
+                        help="Reuse responses for near-duplicate prompts (needs sentence-transformers and faiss-cpu)")
+    parser.add_argument("--targets", metavar="CSV",
+                        help="Generate for every target in a CSV file (columns: email, impersonate)")
+    parser.add_argument("--batch", action="store_true",
+                        help="With --targets, use the OpenAI Batch API (half price, results within 24h)")
+    parser.add_argument("--live", action="store_true",
+                        help="Open the email viewer right away and stream the email into it")
+    args = parser.parse_args()
+    if args.batch and not args.targets:
+        parser.error("--batch requires --targets")
+    if args.no_cache:
+        clear_jira_cache()
+    
     print("🎯 Phishing Email Generator for Cybersecurity Training")
     print("=" * 60)
     
-    # Initialize generator
-    generator = PhishingEmailGenerator()
-    
     # Input attack specifics
-    target_email = input("Enter target email address: ").strip()
-    if not target_email:
-        target_email = "c.zhao@method.me"  # Default for testing
-        print(f"Using default target: {target_email}")
+    if args.targets:
+        targets = load_targets(args.targets)
+        print(f"Loaded {len(targets)} target(s) from {args.targets}")
+    else:
+        target_email = input("Enter target email address: ").strip()
+        if not target_email:
+            target_email = "c.zhao@method.me"  # Default for testing
+            print(f"Using default target: {target_email}")
+        
+        impersonate = input("Enter person to impersonate (optional): ").strip()
     
-    impersonate = input("Enter person to impersonate (optional): ").strip()
     prompts_folder = input("Enter prompts folder path (default: ./prompts): ").strip()
     if not prompts_folder:
         prompts_folder = "./prompts"
     
     print("\n" + "=" * 60)
     
-    # Step 1: Fetch JIRA tickets
-    print("STEP 1: Fetching JIRA tickets...")
+    # Step 1: Initialize generator, loading context from prompts
+    print(f"STEP 1: Loading context from '{prompts_folder}'...")
+    generator = PhishingEmailGenerator(prompts_dir=prompts_folder,
+                                       use_cache=not args.no_cache,
+                                       use_semantic_cache=args.semantic_cache)
+    
+    if args.targets:
+        run_campaign(generator, targets, use_batch_api=args.batch)
+        return
+    
+    # Step 2: Fetch JIRA tickets
+    print("\nSTEP 2: Fetching JIRA tickets...")
     generator.fetch_jira_tickets(target_email, max_results=10)
     
-    # Step 2: Load context from prompts
-    print(f"\nSTEP 2: Loading context from '{prompts_folder}'...")
-    generator.load_prompts_context(prompts_folder)
+    if args.live:
+        # Step 3: Generate in the background while the viewer is already open
+        print("\nSTEP 3: Opening email viewer and streaming the phishing email into it...")
+        
+        def finish(phishing_email: str) -> str:
+            if not phishing_email:
+                raise ValueError("Failed to generate phishing email")
+            phishing_email = generator.replace_links_with_linkly(phishing_email)
+            generator.save_results(phishing_email, target_email)
+            return phishing_email
+        
+        generator.show_email_gui(
+            "", target_email,
+            email_stream=generator.stream_phishing_email(target_email=target_email, impersonate=impersonate),
+            on_complete=finish
+        )
+        return
     
-    # Step 3: Generate phishing email
+    # Step 3: Generate phishing email, printing it as it streams in
     print("\nSTEP 3: Generating phishing email...")
-    phishing_email = generator.generate_phishing_email(
-        target_email=target_email,
-        impersonate=impersonate
-    )
+    parts = []
+    try:
+        for delta in generator.stream_phishing_email(target_email=target_email, impersonate=impersonate):
+            print(delta, end="", flush=True)
+            parts.append(delta)
+        print()
+    except Exception as e:
+        print(f"\nError generating phishing email: {str(e)}")
+        parts = []
+    phishing_email = "".join(parts)
     
     if phishing_email:
         # Step 3.5: Replace LINK_HERE placeholders with Linkly shortened links
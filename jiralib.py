@@ -1,84 +1,253 @@
 from dotenv import load_dotenv
 import os
+import asyncio
+import functools
+import logging
+import threading
+from itertools import islice
+import orjson
+import requests_cache
+from requests.adapters import HTTPAdapter
 from jira import JIRA
-from typing import List, Dict, Any, Optional
+from jira.resilientsession import ResilientSession
+from jira.resources import Issue
+from typing import List, Dict, Any, Iterator, Optional
+
+log = logging.getLogger(__name__)
+
+# Read .env once at import rather than on every connection
+load_dotenv()
+
+# Only request the fields extract_issue_details reads; the default returns the whole issue schema
+FIELDS = "summary,status,priority,issuetype,reporter,assignee,created,updated,duedate,project,description,comment,labels,components,resolution"
+
+# Largest page Jira Cloud returns per search request; larger pages mean fewer round trips
+MAX_PAGE_SIZE = 100
+
+# IDs of the instance's custom fields, discovered once by load_custom_field_ids()
+CUSTOM_FIELD_IDS: Optional[List[str]] = None
+
+
+JIRA_CACHE_NAME = 'jira_cache'
+
+# Serialize first-time setup so concurrent campaign fetches share one client and one field lookup
+_connection_lock = threading.Lock()
+_custom_fields_lock = threading.Lock()
+
+
+class CachedResilientSession(requests_cache.CacheMixin, ResilientSession):
+    """python-jira session that serves repeat GETs from a local SQLite cache."""
+
+
+def install_jira_cache(jira: JIRA, expire_after: int = 300) -> None:
+    """
+    Swap the JIRA client's HTTP session for one that caches GET responses in SQLite.
+    Expired responses that carry an ETag or Last-Modified header are revalidated with a
+    conditional request, so unchanged data comes back as a cheap 304.
+    
+    Args:
+        jira: JIRA connection
+        expire_after: Seconds a cached response is served without revalidation (default: 300)
+    """
+    session = CachedResilientSession(
+        cache_name=JIRA_CACHE_NAME,
+        backend='sqlite',
+        expire_after=expire_after,
+        allowable_methods=['GET']
+    )
+    session.auth = jira._session.auth
+    session.headers.update(jira._session.headers)
+    # python-jira sends Cache-Control: no-cache on every request, which requests_cache honors
+    # by skipping the cache entirely; drop it so repeat GETs are actually served from cache
+    session.headers.pop('Cache-Control', None)
+    jira._session = session
+
+
+def _orjson_response_hook(response, *args, **kwargs):
+    """Make response.json() decode with orjson for every response on the JIRA session."""
+    response.json = lambda **_: orjson.loads(response.content)
+    return response
+
+
+def clear_jira_cache() -> None:
+    """Drop every cached JIRA response."""
+    requests_cache.SQLiteCache(JIRA_CACHE_NAME).clear()
 
 
 def get_jira_connection() -> JIRA:
-    """Establish connection to JIRA using environment variables."""
-    load_dotenv()
+    """
+    Establish connection to JIRA using environment variables.
+    The connection is created once and reused, so later calls share its authenticated
+    keep-alive session instead of repeating the handshake. Safe to call from several threads.
+    """
+    # lru_cache alone lets threads that miss at the same time each build their own client
+    with _connection_lock:
+        return _create_jira_connection()
+
+
+@functools.lru_cache(maxsize=1)
+def _create_jira_connection() -> JIRA:
+    """Build the JIRA client behind get_jira_connection (cached)."""
     api_key = os.getenv("JIRA_API_TOKEN")
     jira_email = os.getenv("JIRA_EMAIL")
     
     if not api_key or not jira_email:
         raise ValueError("JIRA_API_TOKEN and JIRA_EMAIL must be set in environment variables")
     
-    jira = JIRA(server='https://method.atlassian.net/', basic_auth=(jira_email, api_key))
+    # Skip the /serverInfo probe on connect; set JIRA_DEBUG to keep it for diagnostics
+    jira = JIRA(server='https://method.atlassian.net/', basic_auth=(jira_email, api_key),
+                get_server_info=bool(os.getenv('JIRA_DEBUG')))
+    install_jira_cache(jira)
+    
+    # Keep enough pooled keep-alive connections for the concurrent fetches and ask for compressed bodies
+    jira._session.mount('https://', HTTPAdapter(pool_connections=32, pool_maxsize=32))
+    jira._session.headers['Accept-Encoding'] = 'gzip, deflate'
+    
+    # python-jira parses every response through response.json(); route that through orjson
+    jira._session.hooks['response'].append(_orjson_response_hook)
     return jira
 
 
-def get_jira_issues_by_email(assignee_email: str, max_results: int = 50) -> List[Dict[str, Any]]:
+def load_custom_field_ids(jira: JIRA) -> List[str]:
+    """
+    Get the IDs of all custom fields, fetching the field definitions only once per process.
+    
+    Args:
+        jira: JIRA connection
+    
+    Returns:
+        List of custom field IDs (e.g. customfield_10001)
+    """
+    global CUSTOM_FIELD_IDS
+    if CUSTOM_FIELD_IDS is None:
+        with _custom_fields_lock:
+            if CUSTOM_FIELD_IDS is None:
+                CUSTOM_FIELD_IDS = [field['id'] for field in jira.fields() if field.get('custom')]
+    return CUSTOM_FIELD_IDS
+
+
+def iter_issues(jira: JIRA, jql_query: str, page_size: int = MAX_PAGE_SIZE) -> Iterator[Issue]:
+    """
+    Yield issues matching a JQL query, one page at a time.
+    Uses the token-paginated search/jql endpoint, so large result sets are streamed
+    page by page instead of being truncated to a single response.
+    
+    Args:
+        jira: JIRA connection
+        jql_query: JQL query string
+        page_size: Number of issues requested per page (default: MAX_PAGE_SIZE)
+    
+    Returns:
+        Iterator over matching issues
+    """
+    url = jira._get_url('search/jql')
+    # Custom fields only feed diagnostic output, so skip the field-definitions call unless debugging
+    custom_field_ids = load_custom_field_ids(jira) if os.getenv('JIRA_DEBUG') else []
+    fields = ','.join([FIELDS] + custom_field_ids)
+    params = {'jql': jql_query, 'maxResults': page_size, 'fields': fields}
+    
+    while True:
+        # orjson parses the large nested search payloads much faster than the stdlib json module
+        response = jira._session.get(url, params=params)
+        data = orjson.loads(response.content)
+        for raw_issue in data.get('issues', []):
+            yield Issue(jira._options, jira._session, raw=raw_issue)
+        
+        next_page_token = data.get('nextPageToken')
+        if not next_page_token:
+            break
+        params['nextPageToken'] = next_page_token
+
+
+def _status_in_clause(statuses) -> str:
+    """Build a JQL condition matching any of the given statuses."""
+    # A single IN clause is shorter and cheaper for Jira to plan than a chain of ORs
+    return 'status IN (' + ', '.join(f'"{status}"' for status in statuses) + ')'
+
+
+def get_jira_issues_by_email(assignee_email: str, max_results: int = 50, statuses: List[str] = None,
+                             resolution: str = None, updated_since: str = None,
+                             extra_jql: str = None) -> List[Dict[str, Any]]:
     """
     Get JIRA issues assigned to a specific email address.
+    Filters are applied server-side in the JQL so only matching issues are transferred.
     
     Args:
         assignee_email: Email address of the assignee
         max_results: Maximum number of issues to return (default: 50)
+        statuses: Only include issues in these statuses (e.g., ['To Do', 'In Progress'])
+        resolution: Only include issues with this resolution (e.g., 'Unresolved')
+        updated_since: Only include issues updated since this date or relative offset (e.g., '-7d')
+        extra_jql: Additional JQL condition ANDed into the query
     
     Returns:
-        List of dictionaries containing issue details
+        List of dictionaries containing issue details, most recently updated first
     """
     try:
         jira = get_jira_connection()
         
         # Search for issues assigned to the specified email
-        jql_query = f'assignee = "{assignee_email}"'
-        issues = jira.search_issues(jql_query, maxResults=max_results)
+        conditions = [f'assignee = "{assignee_email}"']
+        if statuses:
+            conditions.append(_status_in_clause(statuses))
+        if resolution:
+            # Unresolved is a JQL keyword; anything else is a quoted resolution name
+            conditions.append('resolution = Unresolved' if resolution == 'Unresolved' else f'resolution = "{resolution}"')
+        if updated_since:
+            conditions.append(f'updated >= "{updated_since}"')
+        if extra_jql:
+            conditions.append(f'({extra_jql})')
         
-        issue_list = []
+        # Let the server order results so max_results keeps the most recent issues
+        jql_query = ' AND '.join(conditions) + ' ORDER BY updated DESC'
+        issues = islice(iter_issues(jira, jql_query, page_size=min(max_results, MAX_PAGE_SIZE)), max_results)
         
-        for issue in issues:
-            issue_data = extract_issue_details(issue)
-            issue_list.append(issue_data)
+        issue_list = [extract_issue_details(issue) for issue in issues]
         
         return issue_list
         
     except Exception as e:
-        print(f"Error fetching issues: {str(e)}")
+        log.error("Error fetching issues: %s", e)
         return []
 
 
 def extract_issue_details(issue) -> Dict[str, Any]:
     """Extract detailed information from a JIRA issue object."""
+    # Plain dict lookups on the parsed JSON instead of attribute access through PropertyHolder
+    f = issue.raw['fields']
+    description = f.get('description')
+    priority = f.get('priority')
+    reporter = f.get('reporter')
+    assignee = f.get('assignee')
+    comment = f.get('comment')
+    resolution = f.get('resolution')
     issue_data = {
         'key': issue.key,
-        'summary': issue.fields.summary,
-        'status': issue.fields.status.name,
-        'priority': issue.fields.priority.name if issue.fields.priority else 'None',
-        'issue_type': issue.fields.issuetype.name,
-        'reporter': issue.fields.reporter.displayName if issue.fields.reporter else 'None',
-        'assignee': issue.fields.assignee.displayName if issue.fields.assignee else 'Unassigned',
-        'created': issue.fields.created,
-        'updated': issue.fields.updated,
-        'due_date': issue.fields.duedate if issue.fields.duedate else None,
-        'project_name': issue.fields.project.name,
-        'project_key': issue.fields.project.key,
-        'description': issue.fields.description[:200] + "..." if issue.fields.description and len(issue.fields.description) > 200 else issue.fields.description,
-        'comments_count': issue.fields.comment.total if hasattr(issue.fields, 'comment') and issue.fields.comment else 0,
-        'labels': issue.fields.labels if issue.fields.labels else [],
-        'components': [comp.name for comp in issue.fields.components] if issue.fields.components else [],
-        'resolution': issue.fields.resolution.name if issue.fields.resolution else None,
-        'resolution_description': issue.fields.resolution.description if issue.fields.resolution else None,
+        'summary': f.get('summary'),
+        'status': f['status']['name'],
+        'priority': priority['name'] if priority else 'None',
+        'issue_type': f['issuetype']['name'],
+        'reporter': reporter['displayName'] if reporter else 'None',
+        'assignee': assignee['displayName'] if assignee else 'Unassigned',
+        'created': f.get('created'),
+        'updated': f.get('updated'),
+        'due_date': f.get('duedate') or None,
+        'project_name': f['project']['name'],
+        'project_key': f['project']['key'],
+        'description': description[:200] + "..." if description and len(description) > 200 else description,
+        'comments_count': comment.get('total', 0) if comment else 0,
+        'labels': f.get('labels') or [],
+        'components': [comp['name'] for comp in f.get('components') or []],
+        'resolution': resolution['name'] if resolution else None,
+        'resolution_description': resolution.get('description') if resolution else None,
         'custom_fields': {}
     }
     
-    # Extract custom fields
-    all_fields = dir(issue.fields)
-    for field_name in all_fields:
-        if field_name.startswith('customfield_'):
-            field_value = getattr(issue.fields, field_name, None)
-            if field_value:
-                issue_data['custom_fields'][field_name] = field_value
+    # Extract custom fields by their known IDs straight from the raw JSON
+    for field_id in CUSTOM_FIELD_IDS or []:
+        field_value = f.get(field_id)
+        if field_value:
+            issue_data['custom_fields'][field_id] = field_value
     
     return issue_data
 
@@ -155,21 +324,23 @@ def get_active_jira_issues_by_email(assignee_email: str, max_results: int = 50)
         # Search for active issues assigned to the specified email
         # resolution = Unresolved filters out completed/resolved tickets
         jql_query = f'assignee = "{assignee_email}" AND resolution = Unresolved'
-        issues = jira.search_issues(jql_query, maxResults=max_results)
+        issues = islice(iter_issues(jira, jql_query, page_size=min(max_results, MAX_PAGE_SIZE)), max_results)
         
-        issue_list = []
-        
-        for issue in issues:
-            issue_data = extract_issue_details(issue)
-            issue_list.append(issue_data)
+        issue_list = [extract_issue_details(issue) for issue in issues]
         
         return issue_list
         
     except Exception as e:
-        print(f"Error fetching active issues: {str(e)}")
+        log.error("Error fetching active issues: %s", e)
         return []
 
 
+@functools.lru_cache(maxsize=128)
+def _build_active_jql(assignee_email: str, statuses: tuple) -> str:
+    """Build the JQL query for an assignee's issues in any of the given statuses (cached)."""
+    return f'assignee = "{assignee_email}" AND {_status_in_clause(statuses)}'
+
+
 def get_active_jira_issues_by_status(assignee_email: str, active_statuses: List[str] = None, max_results: int = 50) -> List[Dict[str, Any]]:
     """
     Get JIRA issues by specific active statuses for an assignee.
@@ -189,22 +360,53 @@ def get_active_jira_issues_by_status(assignee_email: str, active_statuses: List[
     try:
         jira = get_jira_connection()
         
-        # Build JQL query with multiple statuses
-        status_query = ' OR '.join([f'status = "{status}"' for status in active_statuses])
-        jql_query = f'assignee = "{assignee_email}" AND ({status_query})'
-        
-        issues = jira.search_issues(jql_query, maxResults=max_results)
+        jql_query = _build_active_jql(assignee_email, tuple(active_statuses))
         
-        issue_list = []
+        issues = islice(iter_issues(jira, jql_query, page_size=min(max_results, MAX_PAGE_SIZE)), max_results)
         
-        for issue in issues:
-            issue_data = extract_issue_details(issue)
-            issue_list.append(issue_data)
+        issue_list = [extract_issue_details(issue) for issue in issues]
         
         return issue_list
         
     except Exception as e:
-        print(f"Error fetching issues by status: {str(e)}")
+        log.error("Error fetching issues by status: %s", e)
         return []
 
 
+async def get_active_jira_issues_by_emails_async(assignee_emails: List[str], max_results: int = 50,
+                                                 concurrency: int = 10) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Get active JIRA issues for several assignees concurrently.
+    Each search runs in a worker thread since the JIRA client is synchronous.
+    
+    Args:
+        assignee_emails: Email addresses of the assignees
+        max_results: Maximum number of issues to return per assignee (default: 50)
+        concurrency: Maximum number of searches in flight (default: 10)
+    
+    Returns:
+        Dictionary mapping each email address to its list of active issue details
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    
+    async def fetch(assignee_email: str) -> List[Dict[str, Any]]:
+        async with semaphore:
+            return await asyncio.to_thread(get_active_jira_issues_by_email, assignee_email, max_results)
+    
+    unique_emails = list(dict.fromkeys(assignee_emails))
+    results = await asyncio.gather(*[fetch(email) for email in unique_emails])
+    return dict(zip(unique_emails, results))
+
+
+def get_active_jira_issues_by_emails(assignee_emails: List[str], max_results: int = 50) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Get active JIRA issues for several assignees concurrently (synchronous wrapper).
+    
+    Args:
+        assignee_emails: Email addresses of the assignees
+        max_results: Maximum number of issues to return per assignee (default: 50)
+    
+    Returns:
+        Dictionary mapping each email address to its list of active issue details
+    """
+    return asyncio.run(get_active_jira_issues_by_emails_async(assignee_emails, max_results))
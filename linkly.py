@@ -1,29 +1,76 @@
 # Generate a 1-shot link with the Linkly API
 from dotenv import load_dotenv
 import os
+import asyncio
+import orjson
 import requests
+from requests.adapters import HTTPAdapter
 
-def create_linkly_oneshot_link(email, api_key, workspace_id, url):
-	api_endpoint = "https://app.linklyhq.com/api/v1/link"  # Replace with actual endpoint if different
-	payload = {
+API_ENDPOINT = "https://app.linklyhq.com/api/v1/link"  # Replace with actual endpoint if different
+HEADERS = {
+	"Content-Type": "application/json",
+	"Accept-Encoding": "gzip",
+	"Connection": "keep-alive"
+}
+
+# One pooled session so repeated link creation reuses the same TLS connection
+_SESSION = requests.Session()
+_SESSION.mount("https://", HTTPAdapter(pool_connections=8, pool_maxsize=8))
+
+def _link_payload(email, api_key, workspace_id, url):
+	return {
 		"email": email,
 		"api_key": api_key,
 		"workspace_id": workspace_id,
 		"url": url
 	}
-	headers = {
-		"Content-Type": "application/json"
-	}
-	response = requests.post(api_endpoint, json=payload, headers=headers)
-	if response.status_code == 200:
-		print("Link created successfully:")
-		print(response.json())
-		return response.json()
+
+def _parse_link_response(response, raise_on_error=False):
+	"""Return the created link from a requests or httpx response, or None on failure."""
+	# Any 2xx counts, create endpoints may answer 201 Created
+	if 200 <= response.status_code < 300:
+		return orjson.loads(response.content)
+	elif raise_on_error:
+		response.raise_for_status()
 	else:
 		print(f"Failed to create link: {response.status_code}")
 		print(response.text)
 		return None
 
+def create_linkly_oneshot_link(email, api_key, workspace_id, url, raise_on_error=False):
+	response = _SESSION.post(API_ENDPOINT, json=_link_payload(email, api_key, workspace_id, url), headers=HEADERS)
+	link = _parse_link_response(response, raise_on_error)
+	if link:
+		print("Link created successfully:")
+		print(link)
+	return link
+
+async def create_linkly_oneshot_link_async(client, email, api_key, workspace_id, url, raise_on_error=False):
+	"""Async variant of create_linkly_oneshot_link using a shared httpx.AsyncClient."""
+	response = await client.post(API_ENDPOINT, json=_link_payload(email, api_key, workspace_id, url), headers=HEADERS)
+	return _parse_link_response(response, raise_on_error)
+
+async def create_linkly_links_async(email, api_key, workspace_id, urls, concurrency=10):
+	"""Create one link per URL concurrently, at most `concurrency` requests in flight."""
+	# Only needed for concurrent link creation, so kept off the import path
+	import httpx
+
+	semaphore = asyncio.Semaphore(concurrency)
+	async with httpx.AsyncClient(timeout=30) as client:
+		async def create(url):
+			async with semaphore:
+				try:
+					return await create_linkly_oneshot_link_async(client, email, api_key, workspace_id, url)
+				except (httpx.HTTPError, ValueError) as e:
+					# One failed request shouldn't cost every other link its result
+					print(f"Failed to create link: {e}")
+					return None
+		return await asyncio.gather(*[create(url) for url in urls])
+
+def create_linkly_links(email, api_key, workspace_id, urls):
+	"""Create one link per URL concurrently; results are in the same order as urls, None where creation failed."""
+	return asyncio.run(create_linkly_links_async(email, api_key, workspace_id, urls))
+
 # Example usage: reads sensitive info from environment variables
 if __name__ == "__main__":
 	load_dotenv()
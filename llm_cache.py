@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Persistent on-disk cache for LLM responses
+"""
+
+import os
+import json
+import time
+import shelve
+import hashlib
+from typing import Dict, Any, Optional
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "phishgen")
+
+
+def cache_key(payload: Dict[str, Any]) -> str:
+    """Build a stable SHA-256 key from a chat completion request payload."""
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+
+
+class LLMCache:
+    """Exact-match cache of LLM responses keyed on the full request payload"""
+
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR, enabled: bool = True):
+        """
+        Initialize the cache
+
+        Args:
+            cache_dir: Directory holding the shelve database
+            enabled: When False every lookup misses and nothing is stored
+        """
+        self.enabled = enabled
+        self.path = os.path.join(cache_dir, "llm_responses")
+        self.stats = {"hits": 0, "misses": 0, "writes": 0}
+
+        if self.enabled:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        Look up a cached response
+
+        Args:
+            key: Cache key built with cache_key()
+
+        Returns:
+            Cached response content, or None on a miss or expired entry
+        """
+        if not self.enabled:
+            return None
+
+        with shelve.open(self.path) as db:
+            entry = db.get(key)
+
+        if entry is None or (entry["expires_at"] is not None and entry["expires_at"] < time.time()):
+            self.stats["misses"] += 1
+            return None
+
+        self.stats["hits"] += 1
+        return entry["content"]
+
+    def set(self, key: str, content: str, ttl: Optional[int] = 3600) -> None:
+        """
+        Store a response
+
+        Args:
+            key: Cache key built with cache_key()
+            content: Response content to store
+            ttl: Seconds until the entry expires (None to never expire)
+        """
+        if not self.enabled or content is None:
+            return
+
+        expires_at = time.time() + ttl if ttl is not None else None
+        with shelve.open(self.path) as db:
+            db[key] = {"content": content, "expires_at": expires_at}
+        self.stats["writes"] += 1
+
+    def clear(self) -> None:
+        """Remove every cached response."""
+        with shelve.open(self.path) as db:
+            db.clear()
@@ -1,8 +1,13 @@
 from jiralib import get_jira_issues_by_email, print_issue_details, get_active_jira_issues_by_email
+import os
+import logging
 import requests
 import json
 from typing import List, Dict, Any      
 
+# Diagnostics (jiralib errors, request debugging with JIRA_DEBUG) go through logging; results are printed
+logging.basicConfig(level=logging.DEBUG if os.getenv('JIRA_DEBUG') else logging.WARNING, format="%(message)s")
+
 """Example usage of the function."""
 # Example: Get issues for a specific email
 email = input("Enter the personalized email for jira ticket fetching: (empty for default)")
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Semantic cache for near-duplicate LLM prompts
+Requires the optional sentence-transformers and faiss-cpu packages
+"""
+
+import os
+import json
+import atexit
+from typing import Dict, List, Optional, Tuple
+
+from llm_cache import DEFAULT_CACHE_DIR
+
+
+class SemanticCache:
+    """Return a stored response when a new prompt embeds close to a previous one"""
+
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR, threshold: float = 0.92,
+                 model_name: str = "all-MiniLM-L6-v2"):
+        """
+        Load the embedding model and any previously persisted responses
+
+        Args:
+            cache_dir: Directory holding the persisted indexes and responses
+            threshold: Minimum cosine similarity for a prompt to count as a hit
+            model_name: Local sentence-transformers model used for embeddings
+        """
+        # Heavy optional dependencies, only imported when the cache is enabled
+        import faiss
+        from sentence_transformers import SentenceTransformer
+
+        self._faiss = faiss
+        self.threshold = threshold
+        self.model = SentenceTransformer(model_name)
+        self.cache_dir = cache_dir
+        self.responses_path = os.path.join(cache_dir, "semantic_responses.json")
+        self.stats = {"hits": 0, "misses": 0, "writes": 0}
+
+        os.makedirs(cache_dir, exist_ok=True)
+
+        # Responses per namespace; each namespace has its own index file, loaded on first use
+        self.responses: Dict[str, List[str]] = {}
+        self.indexes = {}
+        if os.path.exists(self.responses_path):
+            with open(self.responses_path, 'r', encoding='utf-8') as f:
+                stored = json.load(f)
+            # Older caches held one flat list with no namespace, so they can't be matched safely
+            if isinstance(stored, dict):
+                self.responses = stored
+
+        atexit.register(self.save)
+
+    def _index_path(self, namespace: str) -> str:
+        """Return the index file for a namespace."""
+        return os.path.join(self.cache_dir, f"semantic-{namespace}.index")
+
+    def _get_index(self, namespace: str):
+        """Return the index for a namespace, loading or creating it on first use."""
+        if namespace not in self.indexes:
+            index_path = self._index_path(namespace)
+            if namespace in self.responses and os.path.exists(index_path):
+                self.indexes[namespace] = self._faiss.read_index(index_path)
+            else:
+                # Inner product over L2-normalized vectors is cosine similarity
+                self.indexes[namespace] = self._faiss.IndexFlatIP(self.model.get_sentence_embedding_dimension())
+                self.responses[namespace] = []
+        return self.indexes[namespace]
+
+    def embed(self, text: str):
+        """Embed text as a normalized float32 row vector."""
+        return self.model.encode([text], normalize_embeddings=True).astype("float32")
+
+    def search(self, prompt: str, namespace: str = "default") -> Tuple[Optional[str], object]:
+        """
+        Find the closest stored prompt
+
+        Args:
+            prompt: Prompt text to embed
+            namespace: Only prompts stored under the same namespace can match
+
+        Returns:
+            Tuple of (stored response or None, prompt embedding for a later add())
+        """
+        vector = self.embed(prompt)
+        index = self._get_index(namespace)
+
+        if index.ntotal:
+            scores, ids = index.search(vector, 1)
+            if scores[0][0] >= self.threshold:
+                self.stats["hits"] += 1
+                return self.responses[namespace][ids[0][0]], vector
+
+        self.stats["misses"] += 1
+        return None, vector
+
+    def add(self, vector, response: str, namespace: str = "default") -> None:
+        """Store a response under an embedding returned by search() for the same namespace."""
+        if response is None:
+            return
+
+        self._get_index(namespace).add(vector)
+        self.responses[namespace].append(response)
+        self.stats["writes"] += 1
+
+    def save(self) -> None:
+        """Persist the loaded indexes and all responses to disk."""
+        for namespace, index in self.indexes.items():
+            self._faiss.write_index(index, self._index_path(namespace))
+        with open(self.responses_path, 'w', encoding='utf-8') as f:
+            json.dump(self.responses, f)
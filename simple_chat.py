@@ -3,15 +3,18 @@
 Simple OpenAI chat with automatic prompts context loading
 """
 
+import io
 import os
-import glob
-from typing import Dict
+import functools
+from typing import Dict, Optional, TextIO
 from dotenv import load_dotenv
 from openai import OpenAI
 
+# Read .env once at import rather than on every client setup
+load_dotenv()
+
 def setup_openai_client():
     """Setup OpenAI client with API key from environment variables."""
-    load_dotenv()
     api_key = os.getenv("OPENAI_API_KEY")
     
     if not api_key:
@@ -21,23 +24,38 @@ def setup_openai_client():
     return client
 
 def load_prompts_context(prompts_dir: str = "./prompts") -> str:
-    """Load ALL text files from prompts directory and return as context string."""
-    context_parts = []
-    
+    """
+    Load ALL text files from prompts directory and return as context string.
+    The result is reused until a .txt file in the directory is added, removed or modified.
+    """
     if not os.path.exists(prompts_dir):
         print(f"Prompts directory '{prompts_dir}' not found.")
         return ""
     
-    pattern = os.path.join(prompts_dir, "*.txt")
-    txt_files = glob.glob(pattern)
+    try:
+        with os.scandir(prompts_dir) as it:
+            txt_entries = [e for e in it if e.is_file() and e.name.endswith('.txt')]
+    except OSError:
+        # Not a listable directory (e.g. a file path); treat it like a folder with no prompts
+        txt_entries = []
     
-    if not txt_files:
+    if not txt_entries:
         print(f"No .txt files found in '{prompts_dir}'")
         return ""
     
+    files_signature = tuple((e.path, e.stat().st_mtime) for e in txt_entries)
+    return _load_prompts_context_cached(files_signature)
+
+@functools.lru_cache(maxsize=4)
+def _load_prompts_context_cached(files_signature: tuple) -> str:
+    """Build the context string from (file_path, mtime) pairs; memoized on that signature."""
+    txt_files = [file_path for file_path, _ in files_signature]
+    
     print(f"Loading ALL context from {len(txt_files)} files in prompts directory:")
     
-    context_parts.append("=== CONTEXT INFORMATION ===")
+    # Write each file straight into one buffer instead of holding a list of copies
+    buf = io.StringIO()
+    buf.write("=== CONTEXT INFORMATION ===\n")
     
     total_chars = 0
     
@@ -47,8 +65,9 @@ def load_prompts_context(prompts_dir: str = "./prompts") -> str:
                 filename = os.path.basename(file_path)
                 content = f.read().strip()
                 if content:
-                    context_parts.append(f"\n--- {filename.upper()} ---")
-                    context_parts.append(content)
+                    buf.write(f"\n--- {filename.upper()} ---\n")
+                    buf.write(content)
+                    buf.write("\n")
                     total_chars += len(content)
                     print(f"  ✓ {filename} ({len(content)} characters)")
                 else:
@@ -56,13 +75,13 @@ def load_prompts_context(prompts_dir: str = "./prompts") -> str:
         except Exception as e:
             print(f"  ✗ Error reading {file_path}: {str(e)}")
     
-    context_parts.append("\n=== END OF CONTEXT ===\n")
+    buf.write("\n=== END OF CONTEXT ===\n")
     
     print(f"Total context loaded: {total_chars} characters")
-    return "\n".join(context_parts)
+    return buf.getvalue()
 
-def chat_with_context(user_prompt: str, model: str = "gpt-4-turbo"):
-    """Chat with OpenAI using prompts context."""
+def chat_with_context(user_prompt: str, model: str = "gpt-4-turbo", out: Optional[TextIO] = None):
+    """Chat with OpenAI using prompts context, writing tokens to out as they stream in."""
     try:
         client = setup_openai_client()
         
@@ -82,10 +101,20 @@ def chat_with_context(user_prompt: str, model: str = "gpt-4-turbo"):
                 {"role": "user", "content": full_prompt}
             ],
             max_tokens=800,
-            temperature=0.7
+            temperature=0.7,
+            stream=True
         )
         
-        return response.choices[0].message.content
+        parts = []
+        for chunk in response:
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta.content or ""
+            if out is not None:
+                out.write(delta)
+            parts.append(delta)
+        
+        return "".join(parts)
         
     except Exception as e:
         print(f"Error calling OpenAI API: {str(e)}")
@@ -102,27 +131,30 @@ def main():
     print(f"Using prompt: {default_prompt}")
     print("-" * 50)
     
-    response = chat_with_context(default_prompt)
+    # Write the header up front so the response streams straight into the file
+    output_filename = "generated_content.txt"
+    try:
+        with open(output_filename, 'w', encoding='utf-8', buffering=1 << 16) as f:
+            f.write(
+                f"Generated Content\n"
+                f"Prompt: {default_prompt}\n"
+                f"Generated on: {os.getcwd()}\n"
+                f"{'=' * 50}\n\n"
+            )
+            response = chat_with_context(default_prompt, out=f)
+    except Exception as e:
+        print(f"✗ Error saving file: {str(e)}")
+        return
     
     if response:
         print("\nGenerated Content:")
         print("=" * 50)
         print(response)
         print("=" * 50)
-        
-        # Optionally save to file
-        output_filename = "generated_content.txt"
-        try:
-            with open(output_filename, 'w', encoding='utf-8') as f:
-                f.write(f"Generated Content\n")
-                f.write(f"Prompt: {default_prompt}\n")
-                f.write(f"Generated on: {str(os.getcwd())}\n")
-                f.write("=" * 50 + "\n\n")
-                f.write(response)
-            print(f"\n✓ Content saved to: {output_filename}")
-        except Exception as e:
-            print(f"✗ Error saving file: {str(e)}")
+        print(f"\n✓ Content saved to: {output_filename}")
     else:
+        # Don't leave a header-only file behind
+        os.remove(output_filename)
         print("✗ Failed to generate content")
 
 if __name__ == "__main__":